@@ -0,0 +1,43 @@
+"""
+Pure-Python fallbacks used when NumPy is not installed.
+
+Pixel data is handled as flat bytes of R, G, B values. Each message byte
+occupies exactly eight consecutive values. Embedding clears their LSBs
+with bytes.translate and ORs in the message bits as one big integer, so
+the per-value work runs in C. Extraction reads each group of eight
+values as one 64-bit integer (SWAR) instead of one by one.
+"""
+
+_LSB_ONLY = 0x0101010101010101
+
+# Byte value -> its bits, MSB first, spread over the LSBs of a big-endian word
+_SPREAD = [sum(((byte >> k) & 1) << (8 * k) for k in range(8)) for byte in range(256)]
+_GATHER = {word: byte for byte, word in enumerate(_SPREAD)}
+
+# Byte value -> the same bits as 8 bytes of 0/1, and a table clearing the LSB
+_EXPAND = [word.to_bytes(8, 'big') for word in _SPREAD]
+_CLEAR_LSB = bytes(i & 0xFE for i in range(256))
+
+
+def embed(buf, data):
+    """Write the bits of data into the LSBs of the first 8 * len(data) values of buf, in place."""
+    n = 8 * len(data)
+    cleared = buf[:n].translate(_CLEAR_LSB)
+    bits = b''.join(map(_EXPAND.__getitem__, data))
+    buf[:n] = (int.from_bytes(cleared, 'big') | int.from_bytes(bits, 'big')).to_bytes(n, 'big')
+
+
+def extract(buf, delimiter):
+    """Return the bytes hidden in the LSBs of buf before delimiter, or None if it is missing."""
+    data = bytearray()
+    for off in range(0, len(buf) - 7, 8):
+        data.append(_GATHER[int.from_bytes(buf[off:off + 8], 'big') & _LSB_ONLY])
+        if data.endswith(delimiter):
+            return bytes(data[:-len(delimiter)])
+    return None
+
+
+def diff_stats(a, b):
+    """Return (number of differing values, maximum absolute difference) of two byte strings."""
+    diffs = [abs(x - y) for x, y in zip(a, b) if x != y]
+    return len(diffs), max(diffs, default=0)
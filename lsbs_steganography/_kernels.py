@@ -0,0 +1,18 @@
+"""
+Optional Numba-compiled kernels.
+
+This module requires Numba; callers import it lazily and fall back to
+plain NumPy operations when it is not installed.
+"""
+
+from numba import njit, prange
+
+
+# Compiled eagerly for C-contiguous uint8 buffers so the kernel is ready
+# (or loaded from the on-disk cache) at import rather than on first call.
+# It walks the flattened pixel buffer, so it needs no per-channel variants.
+@njit("void(uint8[::1], uint8[::1])", parallel=True, cache=True)
+def embed(flat, bits):
+    """Write each bit into the LSB of the matching value of flat, in place."""
+    for i in prange(bits.size):
+        flat[i] = (flat[i] & 0xFE) | bits[i]
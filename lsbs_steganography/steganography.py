@@ -1,7 +1,84 @@
 import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import argparse
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from . import _fallback
+
+
+# Approximate number of LSBs unpacked per step while scanning for the delimiter
+_CHUNK_BITS = 1 << 19
+
+# Values masked per step when embedding with NumPy, sized to stay in L2 cache
+_EMBED_TILE = 1 << 18
+
+# Images with at least this many channel values (~4MP RGB) are compared in parallel
+_PARALLEL_COMPARE_VALUES = 4_000_000 * 3
+
+# Numba's default workqueue threading layer aborts the process if parallel
+# kernels are launched from several threads at once, so calls are serialized
+_KERNEL_LOCK = threading.Lock()
+
+# Numba embed kernel, imported on first use so that importing the package
+# does not load Numba. None once the import has failed.
+_UNRESOLVED = object()
+_numba_embed = _UNRESOLVED
+
+
+def _get_numba_embed():
+    """Return the Numba embed kernel, or None if Numba is not installed."""
+    global _numba_embed
+    if _numba_embed is _UNRESOLVED:
+        try:
+            from ._kernels import embed
+        except ImportError:
+            embed = None
+        _numba_embed = embed
+    return _numba_embed
+
+
+def _diff_stats_array(a, b):
+    """Return (number of differing values, maximum absolute difference) of two arrays."""
+    diff = np.abs(a - b)
+    if diff.size == 0:
+        return 0, 0
+    return int(np.count_nonzero(diff)), int(diff.max())
+
+
+def _memmap_bmp(path):
+    """
+    Memory-map the pixel array of an uncompressed 24-bit BMP file.
+    
+    Returns a read-only (height, width, 3) view in top-down RGB order, or
+    None if the file is not a BMP of that kind.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(34)
+    if len(header) < 34 or header[:2] != b'BM':
+        return None
+    
+    offset, dib_size, width, height, _, bpp, compression = struct.unpack('<10xIIiiHHI', header)
+    if dib_size < 40 or bpp != 24 or compression != 0 or width <= 0 or height == 0:
+        return None
+    
+    # Rows are padded to a multiple of 4 bytes and stored bottom-up unless
+    # the height is negative
+    stride = (width * 3 + 3) & ~3
+    rows = abs(height)
+    if os.path.getsize(path) < offset + stride * rows:
+        return None
+    
+    raw = np.memmap(path, dtype=np.uint8, mode='r', offset=offset, shape=(rows, stride))
+    pixels = raw[:, :width * 3].reshape(rows, width, 3)[:, :, ::-1]  # BGR -> RGB
+    return pixels[::-1] if height > 0 else pixels
+
 
 class LSBSteganography:
     """
@@ -12,31 +89,113 @@ class LSBSteganography:
     def __init__(self):
         self.delimiter = "###END###"  # Delimiter to mark end of hidden message
     
-    def _message_to_binary(self, message):
-        """Convert message string to binary format."""
-        return ''.join(format(ord(char), '08b') for char in message)
+    @property
+    def delimiter(self):
+        """String marking the end of a hidden message."""
+        return self._delimiter
     
-    def _binary_to_message(self, binary_data):
-        """Convert binary data back to message string."""
-        message = ""
-        for i in range(0, len(binary_data), 8):
-            byte = binary_data[i:i+8]
-            if len(byte) == 8:
-                message += chr(int(byte, 2))
-        return message
+    @delimiter.setter
+    def delimiter(self, value):
+        # Keep the encoded forms used by hide/extract in sync with the delimiter
+        self._delimiter = value
+        self._delim_bytes = value.encode('utf-8')
+        if np is not None:
+            self._delim_bits = self._bytes_to_bits(self._delim_bytes)
     
-    def _modify_pixel(self, pixel, data_bit):
-        """Modify the least significant bit of a pixel value."""
-        # Convert pixel to binary, replace LSB, convert back to int
-        pixel_bin = format(pixel, '08b')
-        modified_pixel_bin = pixel_bin[:-1] + str(data_bit)
-        return int(modified_pixel_bin, 2)
+    def _bytes_to_bits(self, data):
+        """Convert encoded message bytes to an array of bits (uint8 0/1 values)."""
+        return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+    
+    def _open_rgb(self, image_path):
+        """Open an image in RGB mode, converting only when it is not RGB already."""
+        img = Image.open(image_path)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        return img
     
-    def _extract_lsb(self, pixel):
-        """Extract the least significant bit from a pixel value."""
-        return format(pixel, '08b')[-1]
+    def _open_pixels(self, image_path):
+        """Return a read-only (height, width, 3) RGB array of an image's pixels."""
+        pixels = None
+        if isinstance(image_path, (str, os.PathLike)):
+            pixels = _memmap_bmp(image_path)
+        if pixels is None:
+            pixels = np.asarray(self._open_rgb(image_path), dtype=np.uint8)
+        return pixels
+    
+    def _embed(self, img, encoded):
+        """Return a copy of an RGB image with the encoded message and delimiter in its LSBs."""
+        if np is None:
+            buf = bytearray(img.tobytes())
+            _fallback.embed(buf, encoded + self._delim_bytes)
+            return Image.frombytes('RGB', img.size, bytes(buf))
+        
+        bits = np.concatenate([self._bytes_to_bits(encoded), self._delim_bits])
+        
+        # Hide the message in the LSBs of the flattened R, G, B values.
+        # np.asarray() views of a Pillow image are read-only, so take one
+        # contiguous copy to write into.
+        arr = np.array(img, dtype=np.uint8)
+        flat = arr.reshape(-1)
+        numba_embed = _get_numba_embed()
+        if numba_embed is not None:
+            with _KERNEL_LOCK:
+                numba_embed(flat, bits)
+        else:
+            # Mask and merge in place on the uint8 view, one cache-sized tile
+            # at a time so the OR pass reads the tile the AND pass just wrote
+            for start in range(0, bits.size, _EMBED_TILE):
+                tile = flat[start:min(start + _EMBED_TILE, bits.size)]
+                np.bitwise_and(tile, np.uint8(0xFE), out=tile)
+                np.bitwise_or(tile, bits[start:start + tile.size], out=tile)
+        return Image.fromarray(arr)
+    
+    def _extract_bytes(self, image_path):
+        """Return the bytes hidden before the delimiter, or None if it is not found."""
+        if np is None:
+            return _fallback.extract(self._open_rgb(image_path).tobytes(), self._delim_bytes)
+        
+        # Uncompressed BMPs are memory-mapped, not decoded
+        pixels = self._open_pixels(image_path)
+        
+        # Extract binary data from LSBs a block of rows at a time, stopping
+        # as soon as the delimiter shows up. Blocks are a multiple of 8 rows
+        # so that only the last one can end in a partial byte.
+        row_bits = max(1, pixels.shape[1] * pixels.shape[2])
+        rows_per_chunk = max(8, _CHUNK_BITS // row_bits // 8 * 8)
+        data = bytearray()
+        for start in range(0, len(pixels), rows_per_chunk):
+            lsbs = (pixels[start:start + rows_per_chunk] & np.uint8(1)).reshape(-1)
+            lsbs = lsbs[:lsbs.size - lsbs.size % 8]
+            search_from = max(0, len(data) - len(self._delim_bytes) + 1)
+            data += np.packbits(lsbs).tobytes()
+            idx = data.find(self._delim_bytes, search_from)
+            if idx != -1:
+                return bytes(data[:idx])
+        return None
     
-    def hide_message(self, image_path, message, output_path):
+    def _diff_stats(self, original, stego):
+        """Return (number of differing values, maximum difference) of two same-size RGB images."""
+        if np is None:
+            return _fallback.diff_stats(original.tobytes(), stego.tobytes())
+        
+        a = np.asarray(original, dtype=np.int16).reshape(-1)
+        b = np.asarray(stego, dtype=np.int16).reshape(-1)
+        workers = min(32, os.cpu_count() or 1)
+        
+        # NumPy releases the GIL inside ufuncs, so large images are
+        # split into one slice per CPU and reduced in threads
+        if a.size >= _PARALLEL_COMPARE_VALUES and workers > 1:
+            bounds = np.linspace(0, a.size, workers + 1, dtype=np.int64)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    lambda start, end: _diff_stats_array(a[start:end], b[start:end]),
+                    bounds[:-1], bounds[1:]))
+        else:
+            results = [_diff_stats_array(a, b)]
+        
+        return sum(count for count, _ in results), max(peak for _, peak in results)
+    
+    def hide_message(self, image_path, message, output_path, verbose=True):
         """
         Hide a message in an image using LSB steganography.
         
@@ -44,76 +203,76 @@ class LSBSteganography:
             image_path (str): Path to the input image
             message (str): Message to hide
             output_path (str): Path to save the output image
+            verbose (bool): Print a summary with file sizes on success
         
         Returns:
             bool: True if successful, False otherwise
         """
         try:
             # Open the image
-            img = Image.open(image_path)
-            img = img.convert('RGB')  # Ensure RGB format
+            img = self._open_rgb(image_path)  # Ensure RGB format
             
             # Get image dimensions
             width, height = img.size
-            pixels = list(img.getdata())
             
-            # Add delimiter to message to mark its end
-            full_message = message + self.delimiter
-            binary_message = self._message_to_binary(full_message)
+            # The delimiter appended to the message marks its end
+            encoded = message.encode('utf-8')
+            nbits = 8 * (len(encoded) + len(self._delim_bytes))
             
             # Check if image can hold the message
             total_pixels = width * height
             total_bits_available = total_pixels * 3  # RGB has 3 channels
             
-            if len(binary_message) > total_bits_available:
+            if nbits > total_bits_available:
                 print(f"Error: Message too long! Image can hold {total_bits_available} bits, "
-                      f"but message needs {len(binary_message)} bits.")
+                      f"but message needs {nbits} bits.")
                 return False
             
-            # Hide the message
-            data_index = 0
-            modified_pixels = []
-            
-            for pixel in pixels:
-                r, g, b = pixel
-                
-                # Modify red channel
-                if data_index < len(binary_message):
-                    r = self._modify_pixel(r, int(binary_message[data_index]))
-                    data_index += 1
-                
-                # Modify green channel
-                if data_index < len(binary_message):
-                    g = self._modify_pixel(g, int(binary_message[data_index]))
-                    data_index += 1
-                
-                # Modify blue channel
-                if data_index < len(binary_message):
-                    b = self._modify_pixel(b, int(binary_message[data_index]))
-                    data_index += 1
-                
-                modified_pixels.append((r, g, b))
-                
-                # Stop if all message bits are embedded
-                if data_index >= len(binary_message):
-                    # Add remaining pixels unchanged
-                    modified_pixels.extend(pixels[len(modified_pixels):])
-                    break
-            
             # Create new image with modified pixels
-            new_img = Image.new('RGB', (width, height))
-            new_img.putdata(modified_pixels)
-            new_img.save(output_path)
+            self._embed(img, encoded).save(output_path)
             
-            print(f"Message successfully hidden in '{output_path}'")
-            print(f"Original image size: {os.path.getsize(image_path)} bytes")
-            print(f"Steganographic image size: {os.path.getsize(output_path)} bytes")
+            if verbose:
+                print(f"Message successfully hidden in '{output_path}'")
+                print(f"Original image size: {os.path.getsize(image_path)} bytes")
+                print(f"Steganographic image size: {os.path.getsize(output_path)} bytes")
             return True
             
         except Exception as e:
             print(f"Error hiding message: {str(e)}")
             return False
     
+    def hide_message_batch(self, image_paths, messages, output_paths, verbose=False,
+                           max_workers=None):
+        """
+        Hide one message per image for a batch of images, in parallel.
+        
+        Each worker holds a decoded cover and its modified copy at the same
+        time, so peak memory grows with max_workers times the largest image.
+        
+        Args:
+            image_paths (list): Paths to the input images
+            messages (list): Messages to hide, one per input image
+            output_paths (list): Paths to save the output images
+            verbose (bool): Print a summary with file sizes for each image
+            max_workers (int): Number of images processed at once
+                (default: min(32, number of CPUs))
+        
+        Returns:
+            list: One bool per input image, True if it was hidden successfully
+        """
+        if not len(image_paths) == len(messages) == len(output_paths):
+            raise ValueError("image_paths, messages and output_paths must have the same length")
+        
+        if max_workers is None:
+            max_workers = min(32, os.cpu_count() or 1)
+        
+        # Pillow decoding/encoding and the NumPy masking release the GIL,
+        # so covers are processed concurrently in threads
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(
+                lambda job: self.hide_message(*job, verbose=verbose),
+                zip(image_paths, messages, output_paths)))
+    
     def extract_message(self, image_path):
         """
         Extract a hidden message from an image using LSB steganography.
@@ -125,29 +284,11 @@ class LSBSteganography:
             str: The extracted message, or None if extraction fails
         """
         try:
-            # Open the image
-            img = Image.open(image_path)
-            img = img.convert('RGB')
-            pixels = list(img.getdata())
-            
-            # Extract binary data from LSBs
-            binary_data = ""
-            
-            for pixel in pixels:
-                r, g, b = pixel
-                
-                # Extract LSB from each channel
-                binary_data += self._extract_lsb(r)
-                binary_data += self._extract_lsb(g)
-                binary_data += self._extract_lsb(b)
+            data = self._extract_bytes(image_path)
             
-            # Convert binary data to message
-            full_message = self._binary_to_message(binary_data)
-            
-            # Find the delimiter and extract the actual message
-            if self.delimiter in full_message:
-                message = full_message.split(self.delimiter)[0]
-                return message
+            # Decode the actual message preceding the delimiter
+            if data is not None:
+                return data.decode('utf-8', errors='replace')
             else:
                 print("Error: No hidden message found or message corrupted.")
                 return None
@@ -165,27 +306,16 @@ class LSBSteganography:
             stego_path (str): Path to steganographic image
         """
         try:
-            original = Image.open(original_path).convert('RGB')
-            stego = Image.open(stego_path).convert('RGB')
+            original = self._open_rgb(original_path)
+            stego = self._open_rgb(stego_path)
             
             if original.size != stego.size:
                 print("Images have different dimensions!")
                 return
             
-            orig_pixels = list(original.getdata())
-            stego_pixels = list(stego.getdata())
-            
-            differences = 0
-            max_diff = 0
-            
-            for i, (orig, stego) in enumerate(zip(orig_pixels, stego_pixels)):
-                for j in range(3):  # RGB channels
-                    diff = abs(orig[j] - stego[j])
-                    if diff > 0:
-                        differences += 1
-                        max_diff = max(max_diff, diff)
+            differences, max_diff = self._diff_stats(original, stego)
             
-            total_values = len(orig_pixels) * 3
+            total_values = original.size[0] * original.size[1] * 3
             print(f"\nImage Comparison:")
             print(f"Total pixel values: {total_values}")
             print(f"Modified values: {differences}")
@@ -0,0 +1,270 @@
+import struct
+
+import pytest
+from PIL import Image
+
+np = pytest.importorskip("numpy")
+
+from lsbs_steganography import LSBSteganography, _fallback, steganography
+from lsbs_steganography.steganography import _memmap_bmp
+
+MESSAGES = ["hello world", "héllo ✓ 日本", ""]
+
+
+def _random_rgb(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def _save_top_down(src, dst):
+    """Rewrite a bottom-up 24-bit BMP as top-down (negative height)."""
+    raw = bytearray(src.read_bytes())
+    offset, = struct.unpack_from('<I', raw, 10)
+    width, height = struct.unpack_from('<ii', raw, 18)
+    stride = (width * 3 + 3) & ~3
+    rows = [raw[offset + i * stride:offset + (i + 1) * stride] for i in range(height)]
+    raw[offset:offset + stride * height] = b''.join(reversed(rows))
+    struct.pack_into('<i', raw, 22, -height)
+    dst.write_bytes(bytes(raw))
+
+
+@pytest.mark.parametrize("width, height", [(5, 4), (8, 3), (1, 9)])
+def test_memmap_bmp_matches_pillow(tmp_path, width, height):
+    path = tmp_path / "cover.bmp"
+    Image.fromarray(_random_rgb(width, height)).save(path)
+
+    pixels = _memmap_bmp(path)
+
+    assert pixels is not None
+    np.testing.assert_array_equal(pixels, np.asarray(Image.open(path).convert('RGB')))
+
+
+def test_memmap_bmp_top_down(tmp_path):
+    bottom_up = tmp_path / "bottom_up.bmp"
+    top_down = tmp_path / "top_down.bmp"
+    Image.fromarray(_random_rgb(5, 6)).save(bottom_up)
+    _save_top_down(bottom_up, top_down)
+    assert struct.unpack_from('<i', top_down.read_bytes(), 22)[0] == -6
+
+    pixels = _memmap_bmp(top_down)
+
+    assert pixels is not None
+    np.testing.assert_array_equal(pixels, np.asarray(Image.open(top_down).convert('RGB')))
+
+
+@pytest.mark.parametrize("mode", ['L', 'RGBA'])
+def test_memmap_bmp_rejects_non_24_bit(tmp_path, mode):
+    path = tmp_path / "cover.bmp"
+    Image.fromarray(_random_rgb(5, 4)).convert(mode).save(path)
+
+    assert _memmap_bmp(path) is None
+
+
+def test_memmap_bmp_rejects_other_formats(tmp_path):
+    path = tmp_path / "cover.png"
+    Image.fromarray(_random_rgb(5, 4)).save(path)
+
+    assert _memmap_bmp(path) is None
+
+
+@pytest.mark.parametrize("use_numba", [False, True])
+@pytest.mark.parametrize("message", MESSAGES)
+def test_fallback_embed_matches_array_paths(monkeypatch, message, use_numba):
+    if use_numba and steganography._get_numba_embed() is None:
+        pytest.skip("Numba is not installed")
+    if not use_numba:
+        monkeypatch.setattr(steganography, "_numba_embed", None)
+    stego = LSBSteganography()
+    img = Image.fromarray(_random_rgb(40, 30))
+    encoded = message.encode('utf-8')
+
+    buf = bytearray(img.tobytes())
+    _fallback.embed(buf, encoded + stego._delim_bytes)
+
+    assert bytes(buf) == stego._embed(img, encoded).tobytes()
+
+
+@pytest.mark.parametrize("message", MESSAGES)
+def test_fallback_extract_round_trips(message):
+    stego = LSBSteganography()
+    img = Image.fromarray(_random_rgb(40, 30))
+    encoded = message.encode('utf-8')
+    buf = bytearray(img.tobytes())
+    _fallback.embed(buf, encoded + stego._delim_bytes)
+
+    data = _fallback.extract(bytes(buf), stego._delim_bytes)
+
+    assert data == encoded
+    assert data.decode('utf-8') == message
+
+
+def test_fallback_extract_without_delimiter():
+    cover = bytes(Image.fromarray(_random_rgb(40, 30)).tobytes())
+
+    assert _fallback.extract(cover, LSBSteganography()._delim_bytes) is None
+
+
+def test_compare_parallel_matches_numpy(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(steganography, "_PARALLEL_COMPARE_VALUES", 10)
+    monkeypatch.setattr(steganography.os, "cpu_count", lambda: 4)
+    slices = []
+    diff_stats_array = steganography._diff_stats_array
+    monkeypatch.setattr(steganography, "_diff_stats_array",
+                        lambda a, b: slices.append(a.size) or diff_stats_array(a, b))
+    a = _random_rgb(37, 23)
+    b = a.copy()
+    b.reshape(-1)[::5] ^= 1
+    b[7, 11, 2] = a[7, 11, 2] ^ 0x40  # one outlier larger than an LSB flip
+    Image.fromarray(a).save(tmp_path / "a.png")
+    Image.fromarray(b).save(tmp_path / "b.png")
+    stego = LSBSteganography()
+
+    differences, max_diff = stego._diff_stats(Image.open(tmp_path / "a.png"),
+                                              Image.open(tmp_path / "b.png"))
+
+    diff = np.abs(a.astype(np.int16) - b.astype(np.int16))
+    assert (differences, max_diff) == (np.count_nonzero(diff), diff.max())
+    assert max_diff == 0x40
+    assert len(slices) == 4 and sum(slices) == a.size
+
+    stego.compare_images(tmp_path / "a.png", tmp_path / "b.png")
+    out = capsys.readouterr().out
+    assert f"Modified values: {np.count_nonzero(diff)}" in out
+    assert "Maximum difference: 64" in out
+
+
+def _save_cover(path, width, height, mode='RGB', seed=0):
+    Image.fromarray(_random_rgb(width, height, seed)).convert(mode).save(path)
+    return path
+
+
+@pytest.mark.parametrize("ext", ['png', 'bmp'])
+@pytest.mark.parametrize("mode", ['RGB', 'RGBA', 'L', 'P'])
+@pytest.mark.parametrize("message", MESSAGES)
+def test_hide_extract_round_trip(tmp_path, message, mode, ext):
+    cover = _save_cover(tmp_path / f"cover.{ext}", 40, 30, mode)
+    output = tmp_path / f"stego.{ext}"
+    stego = LSBSteganography()
+
+    assert stego.hide_message(cover, message, output, verbose=False)
+    assert stego.extract_message(output) == message
+
+
+def test_hide_capacity_limit(tmp_path):
+    # 8x8 RGB holds 8 * 8 * 3 bits = 24 bytes, including the delimiter
+    cover = _save_cover(tmp_path / "cover.png", 8, 8)
+    stego = LSBSteganography()
+    fits = "a" * (24 - len(stego._delim_bytes))
+
+    assert stego.hide_message(cover, fits, tmp_path / "fits.png", verbose=False)
+    assert stego.extract_message(tmp_path / "fits.png") == fits
+    assert not stego.hide_message(cover, fits + "a", tmp_path / "too_long.png", verbose=False)
+    assert not (tmp_path / "too_long.png").exists()
+
+
+@pytest.mark.parametrize("ext", ['png', 'bmp'])
+@pytest.mark.parametrize("message", MESSAGES)
+def test_round_trip_without_numpy(tmp_path, monkeypatch, capsys, message, ext):
+    cover = _save_cover(tmp_path / f"cover.{ext}", 40, 30)
+    with monkeypatch.context() as m:
+        m.setattr(steganography, "np", None)
+        stego = LSBSteganography()
+        assert stego.hide_message(cover, message, tmp_path / f"stego.{ext}", verbose=False)
+        assert stego.extract_message(tmp_path / f"stego.{ext}") == message
+        stego.compare_images(cover, tmp_path / f"stego.{ext}")
+        fallback_report = capsys.readouterr().out
+
+    # Images written without NumPy read back, and compare, the same with it
+    stego = LSBSteganography()
+    assert stego.extract_message(tmp_path / f"stego.{ext}") == message
+    stego.compare_images(cover, tmp_path / f"stego.{ext}")
+    assert capsys.readouterr().out == fallback_report
+    assert "Maximum difference: 1" in fallback_report
+
+
+@pytest.mark.parametrize("ext", ['png', 'bmp'])
+def test_extract_delimiter_straddles_chunks(tmp_path, monkeypatch, ext):
+    # A 4 pixel wide cover scanned 8 rows (12 bytes) at a time, so across
+    # these lengths the delimiter starts and ends at every offset of a block
+    monkeypatch.setattr(steganography, "_CHUNK_BITS", 64)
+    cover = _save_cover(tmp_path / f"cover.{ext}", 4, 60)
+    output = tmp_path / f"stego.{ext}"
+    stego = LSBSteganography()
+
+    for length in range(30):
+        assert stego.hide_message(cover, "a" * length, output, verbose=False)
+        assert stego.extract_message(output) == "a" * length
+
+
+def test_extract_delimiter_straddles_default_chunk(tmp_path):
+    # 512 * 3 values per row gives blocks of 336 rows, or 64512 bytes
+    cover = _save_cover(tmp_path / "cover.bmp", 512, 400)
+    output = tmp_path / "stego.bmp"
+    stego = LSBSteganography()
+    block_bytes = steganography._CHUNK_BITS // (512 * 3) // 8 * 8 * 512 * 3 // 8
+    message = "a" * (block_bytes - len(stego._delim_bytes) // 2)
+
+    assert stego.hide_message(cover, message, output, verbose=False)
+    assert stego.extract_message(output) == message
+
+
+@pytest.mark.parametrize("ext", ['png', 'bmp'])
+@pytest.mark.parametrize("width", [1, 5])
+def test_extract_narrow_and_padded_rows(tmp_path, monkeypatch, ext, width):
+    monkeypatch.setattr(steganography, "_CHUNK_BITS", 64)
+    cover = _save_cover(tmp_path / f"cover.{ext}", width, 97)
+    output = tmp_path / f"stego.{ext}"
+    stego = LSBSteganography()
+    message = "✓" * ((width * 97 * 3 // 8 - len(stego._delim_bytes)) // 3)
+
+    assert stego.hide_message(cover, message, output, verbose=False)
+    assert stego.extract_message(output) == message
+
+
+@pytest.mark.parametrize("ext", ['png', 'bmp'])
+def test_extract_without_delimiter(tmp_path, ext):
+    cover = _save_cover(tmp_path / f"cover.{ext}", 40, 30)
+
+    assert LSBSteganography().extract_message(cover) is None
+
+
+def test_hide_message_batch(tmp_path):
+    covers = [_save_cover(tmp_path / f"cover{i}.png", 30 + i, 20, seed=i) for i in range(6)]
+    messages = [f"message {i} ✓" * (i + 1) for i in range(6)]
+    outputs = [tmp_path / f"stego{i}.png" for i in range(6)]
+    stego = LSBSteganography()
+
+    assert stego.hide_message_batch(covers, messages, outputs, max_workers=3) == [True] * 6
+    assert [stego.extract_message(path) for path in outputs] == messages
+
+
+def test_hide_message_batch_length_mismatch(tmp_path):
+    cover = _save_cover(tmp_path / "cover.png", 8, 8)
+
+    with pytest.raises(ValueError):
+        LSBSteganography().hide_message_batch([cover, cover], ["a"], [tmp_path / "a.png"])
+
+
+def test_hide_message_batch_unreadable_input(tmp_path):
+    covers = [_save_cover(tmp_path / "cover0.png", 30, 20),
+              tmp_path / "missing.png",
+              _save_cover(tmp_path / "cover2.png", 30, 20, seed=2)]
+    outputs = [tmp_path / f"stego{i}.png" for i in range(3)]
+    stego = LSBSteganography()
+
+    assert stego.hide_message_batch(covers, ["first", "second", "third"], outputs) == [True, False, True]
+    assert stego.extract_message(outputs[0]) == "first"
+    assert stego.extract_message(outputs[2]) == "third"
+
+
+def test_custom_delimiter(tmp_path):
+    cover = _save_cover(tmp_path / "cover.png", 40, 30)
+    output = tmp_path / "stego.png"
+    stego = LSBSteganography()
+    stego.delimiter = '<<EOF>>'
+    message = "before ###END### after"
+
+    assert stego.hide_message(cover, message, output, verbose=False)
+    assert stego.extract_message(output) == message
+    # The default delimiter cuts the message at its own marker
+    assert LSBSteganography().extract_message(output) == "before "